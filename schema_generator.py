@@ -4,83 +4,393 @@ Schema Markup Generator
 Generate structured data markup for SEO optimization.
 """
 
-from flask import Flask, render_template_string, jsonify, request
+from flask import Flask, Response, request
+from flask.json.provider import DefaultJSONProvider
+from functools import lru_cache
+from werkzeug.http import http_date
+import gzip
+import hashlib
 import json
+import math
+import os
+from json.encoder import c_encode_basestring_ascii, py_encode_basestring_ascii
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Compact JSON-to-bytes encoder: orjson when installed, then msgspec, then
+# the stdlib encoder. The stdlib output is ASCII, like _escape_str, so lone
+# surrogates are written as \u escapes instead of failing to encode.
+def _std_dumps(obj):
+    return json.dumps(obj, separators=(',', ':'), allow_nan=False).encode('ascii')
+
+
+if orjson is not None:
+    def _dumps(obj):
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            # orjson rejects integers wider than 64 bits and nesting past its
+            # depth limit; the stdlib encoder handles both.
+            return _std_dumps(obj)
+else:
+    try:
+        from msgspec.json import encode as _dumps
+    except ImportError:
+        _dumps = _std_dumps
+
+# Escape for string field values: the C function returns a fully quoted JSON
+# string without the generic encoder's type dispatch. The pure-Python version
+# only matters on interpreters built without the _json accelerator.
+_escape_str = c_encode_basestring_ascii or py_encode_basestring_ascii
+
+
+def _parse_finite_float(s):
+    value = float(s)
+    if math.isinf(value):
+        raise ValueError('JSON number %s is out of range' % s)
+    return value
+
+
+def _reject_constant(name):
+    raise ValueError('%s is not valid JSON' % name)
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """Default provider with a stricter loads.
+
+    Over-deep nesting and non-finite numbers (NaN, Infinity, 1e400) are
+    reported as parse errors, so get_json(silent=True) treats them like any
+    other malformed body whichever encoder is installed.
+    """
+
+    def loads(self, s, **kwargs):
+        kwargs.setdefault('parse_float', _parse_finite_float)
+        kwargs.setdefault('parse_constant', _reject_constant)
+        try:
+            return json.loads(s, **kwargs)
+        except RecursionError:
+            raise ValueError('JSON document is nested too deeply') from None
+
+
+class OrjsonProvider(StdlibJSONProvider):
+    """JSON provider that encodes with orjson.
+
+    Decoding stays on the stdlib parser: orjson.loads turns integers wider
+    than 64 bits into floats, which would silently alter request data.
+    """
+
+    def _option(self):
+        return orjson.OPT_SORT_KEYS if self.sort_keys else None
+
+    def dumps(self, obj, **kwargs):
+        # Formatting arguments (indent, separators, ...) have no orjson
+        # equivalent; honour them through the stdlib encoder.
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._option()).decode()
+
+    def response(self, *args, **kwargs):
+        if self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self._option())
+        return self._app.response_class(body, mimetype=self.mimetype)
+
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app) if orjson is not None else StdlibJSONProvider(app)
+
+
+def _body_response(body, status=200, headers=None):
+    """Wrap an already-encoded JSON body in a response, bypassing re-encoding."""
+    resp = app.response_class(body, status=status, headers=headers, mimetype='application/json')
+    resp.direct_passthrough = True
+    resp.headers['Content-Length'] = str(len(body))
+    return resp
+
+
+# Error payloads are constant, so they are encoded once rather than per request.
+_ERROR_BODIES = {
+    message: _dumps({'error': message})
+    for message in (
+        'Invalid schema type',
+        'Invalid schema data',
+        'Expected a list of schema requests',
+        'Too many schema requests',
+    )
+}
+
+
+def _error_response(message):
+    """400 response carrying the pre-encoded {"error": message} body."""
+    return _body_response(_ERROR_BODIES[message], 400)
+
+
+class _Slot:
+    """Placeholder recorded for each form field a generator reads."""
+    __slots__ = ('key', 'default')
+
+    def __init__(self, key, default):
+        self.key = key
+        self.default = default
+
+
+class _Probe(dict):
+    """Form data stand-in that returns a _Slot for every lookup."""
+
+    def get(self, key, default=None):
+        return _Slot(key, default)
+
+
+def _layout(node):
+    """JSON-serializable layout of a probed schema, with fields as $field markers."""
+    if isinstance(node, dict):
+        return {key: _layout(value) for key, value in node.items()}
+    if isinstance(node, _Slot):
+        return {'$field': node.key, '$default': node.default}
+    return node
+
+
+# Form fields read by each generator, in extraction order.
+_ORG_KEYS = ('name', 'url', 'logo', 'description', 'street', 'city', 'state', 'zip', 'country', 'phone')
+_PRODUCT_KEYS = ('name', 'description', 'image', 'brand', 'price')
+_ARTICLE_KEYS = ('title', 'description', 'author', 'date', 'image', 'publisher')
+
+
+# Constant skeletons copied per call; the key order here is the key
+# order of the generated document.
+_ORG_TMPL = {
+    "@context": "https://schema.org",
+    "@type": "Organization",
+    "name": "",
+    "url": "",
+    "logo": "",
+    "description": "",
+    "address": None,
+    "contactPoint": None
+}
+
+_ORG_ADDR_TMPL = {
+    "@type": "PostalAddress",
+    "streetAddress": "",
+    "addressLocality": "",
+    "addressRegion": "",
+    "postalCode": "",
+    "addressCountry": ""
+}
+
+_ORG_CONTACT_TMPL = {
+    "@type": "ContactPoint",
+    "telephone": "",
+    "contactType": "customer service"
+}
+
+_PRODUCT_TMPL = {
+    "@context": "https://schema.org",
+    "@type": "Product",
+    "name": "",
+    "description": "",
+    "image": "",
+    "brand": None,
+    "offers": None
+}
+
+_PRODUCT_OFFER_TMPL = {
+    "@type": "Offer",
+    "price": "",
+    "priceCurrency": "USD",
+    "availability": "https://schema.org/InStock"
+}
+
+_ARTICLE_TMPL = {
+    "@context": "https://schema.org",
+    "@type": "Article",
+    "headline": "",
+    "description": "",
+    "author": None,
+    "datePublished": "",
+    "image": "",
+    "publisher": None
+}
+
+
+def generate_organization(data):
+    g = data.get
+    name, url, logo, description, street, city, state, zp, country, phone = [
+        g(k, '') for k in _ORG_KEYS
+    ]
+    o = _ORG_TMPL.copy()
+    o["name"] = name
+    o["url"] = url
+    o["logo"] = logo
+    o["description"] = description
+    a = o["address"] = _ORG_ADDR_TMPL.copy()
+    a["streetAddress"] = street
+    a["addressLocality"] = city
+    a["addressRegion"] = state
+    a["postalCode"] = zp
+    a["addressCountry"] = country
+    c = o["contactPoint"] = _ORG_CONTACT_TMPL.copy()
+    c["telephone"] = phone
+    return o
+
+
+def generate_product(data):
+    g = data.get
+    name, description, image, brand, price = [g(k, '') for k in _PRODUCT_KEYS]
+    p = _PRODUCT_TMPL.copy()
+    p["name"] = name
+    p["description"] = description
+    p["image"] = image
+    p["brand"] = {"@type": "Brand", "name": brand}
+    o = p["offers"] = _PRODUCT_OFFER_TMPL.copy()
+    o["price"] = price
+    o["priceCurrency"] = g('currency', 'USD')
+    return p
+
+
+def generate_article(data):
+    g = data.get
+    title, description, author, date, image, publisher = [g(k, '') for k in _ARTICLE_KEYS]
+    a = _ARTICLE_TMPL.copy()
+    a["headline"] = title
+    a["description"] = description
+    a["author"] = {"@type": "Person", "name": author}
+    a["datePublished"] = date
+    a["image"] = image
+    a["publisher"] = {"@type": "Organization", "name": publisher}
+    return a
+
+
+SCHEMA_FNS = {
+    'Organization': generate_organization,
+    'Product': generate_product,
+    'Article': generate_article
+}
+
 
 class SchemaGenerator:
+    """Compiles the per-type encoders for the builders in SCHEMA_FNS."""
+
     def __init__(self):
-        self.schema_types = {
-            'Organization': self.generate_organization,
-            'Person': self.generate_person,
-            'Product': self.generate_product,
-            'Article': self.generate_article,
-            'LocalBusiness': self.generate_local_business,
-            'Event': self.generate_event
-        }
-    
-    def generate_organization(self, data):
-        return {
-            "@context": "https://schema.org",
-            "@type": "Organization",
-            "name": data.get('name', ''),
-            "url": data.get('url', ''),
-            "logo": data.get('logo', ''),
-            "description": data.get('description', ''),
-            "address": {
-                "@type": "PostalAddress",
-                "streetAddress": data.get('street', ''),
-                "addressLocality": data.get('city', ''),
-                "addressRegion": data.get('state', ''),
-                "postalCode": data.get('zip', ''),
-                "addressCountry": data.get('country', '')
-            },
-            "contactPoint": {
-                "@type": "ContactPoint",
-                "telephone": data.get('phone', ''),
-                "contactType": "customer service"
-            }
-        }
-    
-    def generate_product(self, data):
-        return {
-            "@context": "https://schema.org",
-            "@type": "Product",
-            "name": data.get('name', ''),
-            "description": data.get('description', ''),
-            "image": data.get('image', ''),
-            "brand": {
-                "@type": "Brand",
-                "name": data.get('brand', '')
-            },
-            "offers": {
-                "@type": "Offer",
-                "price": data.get('price', ''),
-                "priceCurrency": data.get('currency', 'USD'),
-                "availability": "https://schema.org/InStock"
-            }
-        }
-    
-    def generate_article(self, data):
-        return {
-            "@context": "https://schema.org",
-            "@type": "Article",
-            "headline": data.get('title', ''),
-            "description": data.get('description', ''),
-            "author": {
-                "@type": "Person",
-                "name": data.get('author', '')
-            },
-            "datePublished": data.get('date', ''),
-            "image": data.get('image', ''),
-            "publisher": {
-                "@type": "Organization",
-                "name": data.get('publisher', '')
-            }
-        }
+        self.schema_types = dict(SCHEMA_FNS)
+        self.encoders = {}
+        self.layouts = {}
+        for name, build in self.schema_types.items():
+            self.encoders[name] = self._compile_encoder(name, build)
+            self.layouts[name] = _layout(build(_Probe()))
+
+    def _compile_encoder(self, name, build):
+        """Generate a function that renders a schema straight to a JSON string.
+
+        The layout is captured by running the dict builder against a probe, so
+        constant keys and values are baked into string literals and only the
+        form fields are escaped per call. The fragments are joined with a
+        single str.join, which sizes the result once and copies each piece in
+        C instead of building an intermediate string per "+". Field values
+        are assumed to be strings; anything else makes the escape raise
+        TypeError and the call falls back to the dict builder and _dumps.
+        """
+        chunks = []
+        literal = []
+
+        def emit(node):
+            if isinstance(node, dict):
+                literal.append('{')
+                for i, (key, value) in enumerate(node.items()):
+                    literal.append((',' if i else '') + json.dumps(key) + ':')
+                    emit(value)
+                literal.append('}')
+            elif isinstance(node, _Slot):
+                chunks.append(repr(''.join(literal)))
+                literal.clear()
+                chunks.append('_e(g(%r, %r))' % (node.key, node.default))
+            else:
+                literal.append(json.dumps(node))
+
+        emit(build(_Probe()))
+        chunks.append(repr(''.join(literal)))
+        src = (
+            'def _dump_%s(d):\n'
+            '    g = d.get\n'
+            '    try:\n'
+            '        return _join((\n            %s,\n        ))\n'
+            '    except TypeError:\n'
+            '        return _dumps(_build(d)).decode()\n'
+        ) % (name, ',\n            '.join(chunks))
+        env = {'_join': ''.join, '_e': _escape_str, '_dumps': _dumps, '_build': build}
+        ns = {}
+        exec(compile(src, '<schema:%s>' % name, 'exec'), env, ns)
+        return ns['_dump_%s' % name]
 
 generator = SchemaGenerator()
+_DISPATCH = generator.encoders
+
+# Only bodies up to this size get their gzip form cached, so oversized
+# payloads cannot pin large entries in memory.
+_CACHEABLE_BODY_BYTES = 8192
+
+_MAX_BATCH_ITEMS = 1000
+
+
+_GZIP_HEADERS = {'Content-Encoding': 'gzip', 'Vary': 'Accept-Encoding'}
+_PLAIN_HEADERS = {'Vary': 'Accept-Encoding'}
+
+
+def _gzip_body(body):
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+
+@lru_cache(maxsize=4096)
+def _cached_gzip(body):
+    """Gzip form of an encoded body, compressed once per distinct body."""
+    return _gzip_body(body)
+
+
+def _gzip_for(body):
+    """Gzip form of body for a client that accepted it, cached when small."""
+    if len(body) <= _CACHEABLE_BODY_BYTES:
+        return _cached_gzip(body)
+    return _gzip_body(body)
+
+
+class _InvalidPayload(ValueError):
+    """Raised for a {type, data} payload that cannot be rendered."""
+
+
+def _encode_payload(data):
+    """Encoded body for one {type, data} payload.
+
+    Raises _InvalidPayload for a malformed payload.
+    """
+    if not isinstance(data, dict):
+        raise _InvalidPayload('Invalid schema type')
+    schema_type = data.get('type')
+    encode = _DISPATCH.get(schema_type) if isinstance(schema_type, str) else None
+    if encode is None:
+        raise _InvalidPayload('Invalid schema type')
+    form_data = data.get('data')
+    if form_data is None:
+        form_data = {}
+    elif not isinstance(form_data, dict):
+        raise _InvalidPayload('Invalid schema data')
+    try:
+        body = encode(form_data).encode('utf-8')
+    except (TypeError, ValueError, RecursionError):
+        # A value no available encoder can handle, such as lists nested past
+        # the interpreter's recursion limit or a non-finite float.
+        raise _InvalidPayload('Invalid schema data') from None
+    return body
+
+
+def _encoded_response(body, gz=None):
+    """Serve gz when the client accepted it and it is actually smaller."""
+    if gz is not None and len(gz) < len(body):
+        return _body_response(gz, headers=_GZIP_HEADERS)
+    return _body_response(body, headers=_PLAIN_HEADERS)
 
 HTML_TEMPLATE = """
 <!DOCTYPE html>
@@ -129,6 +439,18 @@ HTML_TEMPLATE = """
     </div>
     
     <script>
+        // Schema layouts from the server-side builders; form fields appear as
+        // {"$field": ..., "$default": ...} markers.
+        const SCHEMA_LAYOUTS = __SCHEMA_LAYOUTS__;
+        
+        function fillLayout(node, data) {
+            if (node === null || typeof node !== 'object') return node;
+            if ('$field' in node) return node.$field in data ? data[node.$field] : node.$default;
+            const out = {};
+            for (const key in node) out[key] = fillLayout(node[key], data);
+            return out;
+        }
+        
         function updateForm() {
             const type = document.getElementById('schemaType').value;
             const fields = document.getElementById('formFields');
@@ -167,6 +489,12 @@ HTML_TEMPLATE = """
                 formData[input.id] = input.value;
             });
             
+            const output = document.getElementById('output');
+            if (type in SCHEMA_LAYOUTS) {
+                output.textContent = JSON.stringify(fillLayout(SCHEMA_LAYOUTS[type], formData), null, 2);
+                return;
+            }
+            
             try {
                 const response = await fetch('/api/generate', {
                     method: 'POST',
@@ -175,7 +503,7 @@ HTML_TEMPLATE = """
                 });
                 
                 const schema = await response.json();
-                document.getElementById('output').textContent = JSON.stringify(schema, null, 2);
+                output.textContent = JSON.stringify(schema, null, 2);
             } catch (error) {
                 console.error('Error:', error);
             }
@@ -188,22 +516,84 @@ HTML_TEMPLATE = """
 </html>
 """
 
+def _minify_html(html):
+    """Strip indentation and blank lines from the page markup."""
+    return '\n'.join(line.strip() for line in html.splitlines() if line.strip())
+
+
+# The index page only embeds the schema layouts, so render, minify and
+# compress it once at import. "</" is escaped so the JSON cannot close the
+# <script> element.
+_INDEX_HTML = HTML_TEMPLATE.replace(
+    '__SCHEMA_LAYOUTS__', json.dumps(generator.layouts, separators=(',', ':')).replace('</', '<\\/')
+)
+_INDEX_MIN = _minify_html(_INDEX_HTML).encode('utf-8')
+_INDEX_GZ = gzip.compress(_INDEX_MIN, compresslevel=9, mtime=0)
+# The page is fully determined by this file, so its mtime is identical in
+# every worker process, unlike an import timestamp.
+_INDEX_LAST_MODIFIED = http_date(os.path.getmtime(__file__))
+_INDEX_ETAG = hashlib.md5(_INDEX_MIN).hexdigest()
+_INDEX_GZ_ETAG = _INDEX_ETAG + '-gz'
+_INDEX_RESP_HEADERS = {
+    'Content-Type': 'text/html; charset=utf-8',
+    'Content-Length': str(len(_INDEX_MIN)),
+    'ETag': '"%s"' % _INDEX_ETAG,
+    'Last-Modified': _INDEX_LAST_MODIFIED,
+    'Vary': 'Accept-Encoding',
+}
+_INDEX_GZ_RESP_HEADERS = {
+    'Content-Type': 'text/html; charset=utf-8',
+    'Content-Encoding': 'gzip',
+    'Content-Length': str(len(_INDEX_GZ)),
+    'ETag': '"%s"' % _INDEX_GZ_ETAG,
+    'Last-Modified': _INDEX_LAST_MODIFIED,
+    'Vary': 'Accept-Encoding',
+}
+
 @app.route('/')
 def index():
-    return render_template_string(HTML_TEMPLATE)
+    if request.accept_encodings['gzip']:
+        body, headers = _INDEX_GZ, _INDEX_GZ_RESP_HEADERS
+    else:
+        body, headers = _INDEX_MIN, _INDEX_RESP_HEADERS
+    # Handles If-None-Match / If-Modified-Since against the precomputed
+    # ETag and Last-Modified headers.
+    return Response(body, headers=headers).make_conditional(request)
 
 @app.route('/api/generate', methods=['POST'])
 def generate_schema():
-    data = request.get_json()
-    schema_type = data.get('type')
-    form_data = data.get('data', {})
-    
-    if schema_type in generator.schema_types:
-        schema = generator.schema_types[schema_type](form_data)
-        return jsonify(schema)
-    
-    return jsonify({'error': 'Invalid schema type'}), 400
+    data = request.get_json(cache=False, silent=True)
+    try:
+        body = _encode_payload(data)
+    except _InvalidPayload as e:
+        return _error_response(str(e))
+    if request.accept_encodings['gzip']:
+        return _encoded_response(body, _gzip_for(body))
+    return _encoded_response(body)
+
+@app.route('/api/generate_batch', methods=['POST'])
+def generate_schema_batch():
+    """Render a list of {type, data} payloads in one round-trip.
+
+    Invalid items yield an {"error": ...} object in their slot instead of
+    failing the whole batch.
+    """
+    items = request.get_json(cache=False, silent=True)
+    if not isinstance(items, list):
+        return _error_response('Expected a list of schema requests')
+    if len(items) > _MAX_BATCH_ITEMS:
+        return _error_response('Too many schema requests')
+    parts = []
+    for item in items:
+        try:
+            parts.append(_encode_payload(item))
+        except _InvalidPayload as e:
+            parts.append(_ERROR_BODIES[str(e)])
+    body = b'[' + b','.join(parts) + b']'
+    gz = _gzip_body(body) if request.accept_encodings['gzip'] else None
+    return _encoded_response(body, gz)
 
 if __name__ == "__main__":
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # Development server only; production runs under gunicorn via wsgi.py.
+    app.run(debug=bool(os.environ.get('FLASK_DEV')), host='0.0.0.0', port=5000)
 
@@ -3,6 +3,8 @@ Unit tests for Schema-Markup-Generator
 Auto-generated test scaffold — extend with project-specific tests
 """
 
+import gzip
+import json
 import pytest
 import os
 import sys
@@ -17,6 +19,20 @@ except ImportError:
     HAS_SCHEMA_GENERATOR = False
 
 
+@pytest.fixture
+def client():
+    """Flask test client for the schema_generator app."""
+    return schema_generator.app.test_client()
+
+
+def nested_list(depth):
+    """Return an empty list wrapped in depth further lists."""
+    value = []
+    for _ in range(depth):
+        value = [value]
+    return value
+
+
 class TestProjectStructure:
     """Test project structure and configuration."""
     
@@ -48,5 +64,319 @@ class TestSchemaGenerator:
             assert hasattr(schema_generator, '__name__')
 
 
+@pytest.mark.skipif(not HAS_SCHEMA_GENERATOR, reason="schema_generator not importable")
+class TestJsonProvider:
+    """Tests for the orjson-backed Flask JSON provider."""
+
+    def test_provider_installed(self):
+        """Test that the app uses the orjson provider."""
+        assert isinstance(schema_generator.app.json, schema_generator.OrjsonProvider)
+
+    def test_provider_round_trip(self):
+        """Test that jsonify and loads go through the provider."""
+        import datetime
+        from flask import jsonify
+        app = schema_generator.app
+        with app.app_context():
+            resp = jsonify(b=1, a=datetime.date(2024, 1, 15))
+        assert resp.mimetype == 'application/json'
+        assert resp.get_data() == b'{"a":"2024-01-15","b":1}'
+        assert app.json.loads(app.json.dumps({'x': [1, 2]})) == {'x': [1, 2]}
+
+    def test_provider_honours_formatting(self, monkeypatch):
+        """Test that formatting kwargs and pretty-printing are not dropped."""
+        from flask import jsonify
+        app = schema_generator.app
+        assert app.json.dumps({'b': 1, 'a': 2}, indent=2) == json.dumps({'b': 1, 'a': 2}, indent=2, sort_keys=True)
+        monkeypatch.setattr(app.json, 'compact', False)
+        with app.app_context():
+            resp = jsonify(a=1)
+        assert resp.get_data(as_text=True) == '{\n  "a": 1\n}\n'
+
+    def test_big_integers_preserved(self, client):
+        """Test that request parsing keeps integers wider than 64 bits exact."""
+        body = '{"type": "Product", "data": {"price": 123456789012345678901234567890}}'
+        resp = client.post('/api/generate', data=body, content_type='application/json')
+        assert b'"price":123456789012345678901234567890' in resp.data
+
+    def test_without_orjson(self, monkeypatch):
+        """Test that the module falls back to another encoder without orjson."""
+        import importlib.util
+        monkeypatch.setitem(sys.modules, 'orjson', None)
+        spec = importlib.util.spec_from_file_location('schema_generator_no_orjson', schema_generator.__file__)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        assert module.orjson is None
+        assert not isinstance(module.app.json, schema_generator.OrjsonProvider)
+        assert isinstance(module.app.json, module.StdlibJSONProvider)
+        client = module.app.test_client()
+        resp = client.post('/api/generate', json={'type': 'Product', 'data': {'price': 5}})
+        assert resp.get_json()['offers']['price'] == 5
+
+        body = '{"type": "Product", "data": {"name": "\\ud800", "price": 1}}'
+        resp = client.post('/api/generate', data=body, content_type='application/json')
+        assert resp.status_code == 200
+        assert b'"name":"\\ud800"' in resp.data
+
+        deep = '{"type": "Product", "data": {"price": %s%s}}' % ('[' * 5000, ']' * 5000)
+        resp = client.post('/api/generate', data=deep, content_type='application/json')
+        assert resp.status_code == 400
+
+        for number in ('NaN', 'Infinity', '-Infinity', '1e400'):
+            body = '{"type": "Product", "data": {"price": %s}}' % number
+            resp = client.post('/api/generate', data=body, content_type='application/json')
+            assert resp.status_code == 400
+
+        with pytest.raises(module._InvalidPayload, match='Invalid schema data'):
+            module._encode_payload({'type': 'Product', 'data': {'price': float('nan')}})
+
+    @pytest.mark.parametrize('number', ['NaN', 'Infinity', '-Infinity', '1e400'])
+    def test_non_finite_numbers_rejected(self, client, number):
+        """Test that non-finite numbers are rejected as malformed JSON."""
+        body = '{"type": "Product", "data": {"price": %s}}' % number
+        resp = client.post('/api/generate', data=body, content_type='application/json')
+        assert resp.status_code == 400
+
+
+@pytest.mark.skipif(not HAS_SCHEMA_GENERATOR, reason="schema_generator not importable")
+class TestCompiledEncoders:
+    """Tests for the generated per-type JSON encoders."""
+
+    @pytest.mark.parametrize('schema_type', ['Organization', 'Product', 'Article'])
+    def test_encoder_matches_builder(self, schema_type):
+        """Test that each encoder renders the same document as its dict builder."""
+        generator = schema_generator.generator
+        data = {'name': 'Caf\u00e9 "Quoted"', 'title': 'Line\nbreak', 'price': 19.99}
+        body = generator.encoders[schema_type](data)
+        assert json.loads(body) == generator.schema_types[schema_type](data)
+
+    def test_schema_fns_are_module_functions(self):
+        """Test that the builders are plain functions shared with SchemaGenerator."""
+        assert schema_generator.SCHEMA_FNS['Article'] is schema_generator.generate_article
+        assert schema_generator.generator.schema_types == schema_generator.SCHEMA_FNS
+
+    def test_encoder_uses_field_defaults(self):
+        """Test that missing fields fall back to the builder defaults."""
+        body = schema_generator.generator.encoders['Product']({})
+        assert json.loads(body)['offers']['priceCurrency'] == 'USD'
+
+
+@pytest.mark.skipif(not HAS_SCHEMA_GENERATOR, reason="schema_generator not importable")
+class TestIndexPage:
+    """Tests for the / page."""
+
+    def test_index_served(self, client):
+        """Test that the index page is served as HTML with an ETag."""
+        resp = client.get('/')
+        assert resp.status_code == 200
+        assert resp.mimetype == 'text/html'
+        assert b'Schema Markup Generator' in resp.data
+        assert resp.headers['ETag']
+
+    def test_index_embeds_layouts(self, client):
+        """Test that the page embeds layouts that reproduce the builders' output."""
+        def fill(node, data):
+            if not isinstance(node, dict):
+                return node
+            if '$field' in node:
+                return data.get(node['$field'], node['$default'])
+            return {key: fill(value, data) for key, value in node.items()}
+
+        page = client.get('/').get_data(as_text=True)
+        assert '__SCHEMA_LAYOUTS__' not in page
+        generator = schema_generator.generator
+        assert json.dumps(generator.layouts, separators=(',', ':')) in page
+        data = {'name': 'Acme', 'title': 'Hello', 'currency': 'EUR'}
+        for schema_type, layout in generator.layouts.items():
+            assert fill(layout, data) == generator.schema_types[schema_type](data)
+
+    def test_index_not_modified(self, client):
+        """Test that a matching If-None-Match returns 304."""
+        etag = client.get('/').headers['ETag']
+        resp = client.get('/', headers={'If-None-Match': etag})
+        assert resp.status_code == 304
+        assert resp.data == b''
+
+    def test_index_last_modified_stable(self, client):
+        """Test that Last-Modified comes from the module file, not import time."""
+        from werkzeug.http import http_date
+        expected = http_date(os.path.getmtime(schema_generator.__file__))
+        assert client.get('/').headers['Last-Modified'] == expected
+
+    def test_index_not_modified_since(self, client):
+        """Test that a current If-Modified-Since returns 304."""
+        last_modified = client.get('/').headers['Last-Modified']
+        resp = client.get('/', headers={'If-Modified-Since': last_modified})
+        assert resp.status_code == 304
+
+    def test_index_gzip(self, client):
+        """Test that gzip-capable clients get the precompressed page."""
+        resp = client.get('/', headers={'Accept-Encoding': 'gzip, deflate'})
+        assert resp.headers['Content-Encoding'] == 'gzip'
+        assert resp.headers['Vary'] == 'Accept-Encoding'
+        assert gzip.decompress(resp.data) == client.get('/').data
+
+
+@pytest.mark.skipif(not HAS_SCHEMA_GENERATOR, reason="schema_generator not importable")
+class TestGenerateEndpoint:
+    """Tests for the /api/generate endpoint."""
+
+    def test_generate_organization(self, client):
+        """Test that a valid request returns the schema as JSON."""
+        resp = client.post('/api/generate', json={'type': 'Organization', 'data': {'name': 'Acme'}})
+        assert resp.status_code == 200
+        assert resp.mimetype == 'application/json'
+        schema = resp.get_json()
+        assert schema['@type'] == 'Organization'
+        assert schema['name'] == 'Acme'
+        assert schema['address']['@type'] == 'PostalAddress'
+
+    def test_generate_invalid_type(self, client):
+        """Test that an unknown schema type is rejected."""
+        resp = client.post('/api/generate', json={'type': 'Nope', 'data': {}})
+        assert resp.status_code == 400
+        assert resp.get_json() == {'error': 'Invalid schema type'}
+
+    def test_generate_null_data(self, client):
+        """Test that a missing or null data field renders the defaults."""
+        for payload in ({'type': 'Product'}, {'type': 'Product', 'data': None}):
+            resp = client.post('/api/generate', json=payload)
+            assert resp.status_code == 200
+            assert resp.get_json()['offers']['priceCurrency'] == 'USD'
+
+    def test_generate_non_string_values(self, client):
+        """Test that non-string field values keep their type."""
+        for price in (1, True, 1.5):
+            resp = client.post('/api/generate', json={'type': 'Product', 'data': {'price': price}})
+            assert resp.get_json()['offers']['price'] == price
+            assert type(resp.get_json()['offers']['price']) is type(price)
+
+    def test_generate_gzip(self, client):
+        """Test that gzip-capable clients get a compressed schema body."""
+        payload = {'type': 'Organization', 'data': {'name': 'Acme', 'url': 'https://acme.example'}}
+        plain = client.post('/api/generate', json=payload)
+        resp = client.post('/api/generate', json=payload, headers={'Accept-Encoding': 'gzip'})
+        assert resp.headers['Content-Encoding'] == 'gzip'
+        assert resp.headers['Vary'] == 'Accept-Encoding'
+        assert gzip.decompress(resp.data) == plain.data
+        assert int(resp.headers['Content-Length']) == len(resp.data)
+
+    def test_generate_deeply_nested_value(self, client):
+        """Test that values past orjson's depth limit are still encoded."""
+        price = nested_list(300)
+        body = json.dumps({'type': 'Product', 'data': {'price': price}})
+        resp = client.post('/api/generate', data=body, content_type='application/json')
+        assert resp.status_code == 200
+        assert json.loads(resp.data)['offers']['price'] == price
+
+    def test_generate_lone_surrogate(self, client):
+        """Test that a lone surrogate on the builder fallback path is escaped."""
+        body = '{"type": "Product", "data": {"name": "\\ud800", "price": 1}}'
+        resp = client.post('/api/generate', data=body, content_type='application/json')
+        assert resp.status_code == 200
+        assert b'"name":"\\ud800"' in resp.data
+
+    def test_generate_too_deeply_nested_body(self, client):
+        """Test that a body too deep to parse is a 400, not a 500."""
+        body = '{"type": "Product", "data": {"price": %s%s}}' % ('[' * 5000, ']' * 5000)
+        resp = client.post('/api/generate', data=body, content_type='application/json')
+        assert resp.status_code == 400
+
+    def test_generate_gzip_only_when_accepted(self, client, monkeypatch):
+        """Test that plain clients never pay for compression and gzip bodies are cached."""
+        calls = []
+        gzip_body = schema_generator._gzip_body
+        monkeypatch.setattr(schema_generator, '_gzip_body', lambda body: calls.append(body) or gzip_body(body))
+        schema_generator._cached_gzip.cache_clear()
+        payload = {'type': 'Article', 'data': {'title': 'Gzip once'}}
+        client.post('/api/generate', json=payload)
+        assert calls == []
+        client.post('/api/generate', json=payload, headers={'Accept-Encoding': 'gzip'})
+        client.post('/api/generate', json=payload, headers={'Accept-Encoding': 'gzip'})
+        assert len(calls) == 1
+        assert schema_generator._cached_gzip.cache_info().hits == 1
+
+    def test_generate_malformed_body(self, client):
+        """Test that a malformed JSON body is rejected without raising."""
+        resp = client.post('/api/generate', data='{not json', content_type='application/json')
+        assert resp.status_code == 400
+        assert resp.get_json() == {'error': 'Invalid schema type'}
+
+    @pytest.mark.parametrize('payload, error', [
+        ([1, 2], 'Invalid schema type'),
+        ({'type': ['Organization']}, 'Invalid schema type'),
+        ({'type': 'Organization', 'data': 'name'}, 'Invalid schema data'),
+        ({'type': 'Organization', 'data': 0}, 'Invalid schema data'),
+        ({'type': 'Organization', 'data': False}, 'Invalid schema data'),
+        ({'type': 'Organization', 'data': ''}, 'Invalid schema data'),
+        ({'type': 'Organization', 'data': []}, 'Invalid schema data'),
+    ])
+    def test_generate_wrong_shape(self, client, payload, error):
+        """Test that well-formed JSON of the wrong shape is rejected."""
+        resp = client.post('/api/generate', json=payload)
+        assert resp.status_code == 400
+        assert resp.get_json() == {'error': error}
+
+
+
+@pytest.mark.skipif(not HAS_SCHEMA_GENERATOR, reason="schema_generator not importable")
+class TestGenerateBatchEndpoint:
+    """Tests for the /api/generate_batch endpoint."""
+
+    def test_batch_matches_single(self, client):
+        """Test that each batch result equals the single-request result."""
+        items = [
+            {'type': 'Organization', 'data': {'name': 'Acme'}},
+            {'type': 'Article', 'data': {'title': 'Hello', 'date': '2024-01-15'}},
+        ]
+        resp = client.post('/api/generate_batch', json=items)
+        assert resp.status_code == 200
+        assert int(resp.headers['Content-Length']) == len(resp.data)
+        expected = [client.post('/api/generate', json=item).get_json() for item in items]
+        assert resp.get_json() == expected
+
+    def test_batch_compresses_once(self, client, monkeypatch):
+        """Test that a batch is never compressed per item, only as a whole."""
+        calls = []
+        gzip_body = schema_generator._gzip_body
+        monkeypatch.setattr(schema_generator, '_gzip_body', lambda body: calls.append(body) or gzip_body(body))
+        items = [{'type': 'Organization', 'data': {'name': 'Batch %d' % i}} for i in range(20)]
+        client.post('/api/generate_batch', json=items)
+        assert calls == []
+        resp = client.post('/api/generate_batch', json=items, headers={'Accept-Encoding': 'gzip'})
+        assert len(calls) == 1
+        assert len(json.loads(gzip.decompress(resp.data))) == 20
+
+    def test_batch_invalid_item(self, client):
+        """Test that an invalid item is reported in place."""
+        resp = client.post('/api/generate_batch', json=[{'type': 'Nope'}, {'type': 'Product'}])
+        results = resp.get_json()
+        assert results[0] == {'error': 'Invalid schema type'}
+        assert results[1]['@type'] == 'Product'
+
+    def test_batch_deeply_nested_item(self, client):
+        """Test that an item past orjson's depth limit does not fail the batch."""
+        price = nested_list(300)
+        items = [{'type': 'Product', 'data': {'price': price}}, {'type': 'Article'}]
+        resp = client.post('/api/generate_batch', data=json.dumps(items), content_type='application/json')
+        assert resp.status_code == 200
+        results = json.loads(resp.data)
+        assert results[0]['offers']['price'] == price
+        assert results[1]['@type'] == 'Article'
+
+    def test_batch_lone_surrogate(self, client):
+        """Test that a lone surrogate in one item does not fail the batch."""
+        body = '[{"type": "Product", "data": {"name": "\\ud800", "price": 1}}, {"type": "Article"}]'
+        resp = client.post('/api/generate_batch', data=body, content_type='application/json')
+        assert resp.status_code == 200
+        assert b'"name":"\\ud800"' in resp.data
+        assert json.loads(resp.data)[1]['@type'] == 'Article'
+
+    def test_batch_requires_list(self, client):
+        """Test that a non-list body is rejected."""
+        resp = client.post('/api/generate_batch', json={'type': 'Product'})
+        assert resp.status_code == 400
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,12 @@
+"""
+WSGI entry point for production servers.
+
+    gunicorn -k gthread -w "$(nproc)" --threads 4 -t 30 -b 0.0.0.0:8000 wsgi:application
+
+With gevent installed, ``-k gevent`` suits deployments dominated by slow
+clients rather than CPU.
+"""
+
+from schema_generator import app
+
+application = app